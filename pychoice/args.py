@@ -7,32 +7,168 @@ call stacks and applying the appropriate implementations.
 
 from __future__ import annotations
 
+import functools
 import inspect
-from dataclasses import dataclass
-from functools import cmp_to_key
-from typing import Any, Callable, Optional, TypeVar
+import threading
+import types
+from collections.abc import Collection, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, TypeVar, cast
 from uuid import UUID, uuid5
 
-from .selector import OptStackFrame, SelectorItem, StackFrame
+from .selector import (
+    FrameIter,
+    FrameStack,
+    FrameView,
+    OptStackFrame,
+    SelectorItem,
+    StackFingerprint,
+    StackFrame,
+    current_stack,
+    iter_stack,
+)
 
 F = TypeVar("F", bound=Callable[..., Any])
 type RuleVals = Callable[[list[dict[str, Any]]], Optional[tuple[ChoiceFuncImplementation | None, dict[str, Any]]]]
 
 UUID_NAMESPACE = UUID("e7221d32-4940-4c49-b0e3-5f03446226ab")
 
+MATCH_CACHE_SIZE = 1024
+_match_cache: dict[tuple[int, tuple[int, ...]], tuple[object, tuple[Any, ...], Any]] = {}
+"""LRU cache of match results keyed by (id(owner), stack fingerprint), where owner is a RuleTrie or its static token."""
+_match_cache_lock = threading.Lock()
+"""Guards the reordering and eviction of _match_cache between threads."""
 
-@dataclass
+MERGE_CACHE_SIZE = 256
+
+SIGNATURE_CACHE_SIZE = 256
+
+T = TypeVar("T")
+
+_POSITIONAL_KINDS = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+
+
+def _memoize_match(owner: object, fingerprint: StackFingerprint, compute: Callable[[], T]) -> T:
+    """Look up or compute a match result in the shared LRU match cache.
+
+    The cache entry holds a reference to owner and to the fingerprinted code
+    objects so that their ids can not be reused while the entry is alive. The
+    ``self`` objects in the fingerprint are only weakly referenced, so an entry
+    whose objects died is recomputed.
+
+    Args:
+        owner: The object the result belongs to (a RuleTrie or its static token)
+        fingerprint: The stack_fingerprint() of the matched stack
+        compute: Computes the result on a cache miss
+
+    Returns:
+        The cached or freshly computed result
+    """
+    key = (id(owner), fingerprint[0])
+    with _match_cache_lock:
+        cached = _match_cache.pop(key, None)
+        # The code refs come first, followed by the weak refs of the self objects
+        if cached is not None and all(r is None or r() is not None for r in cached[1][fingerprint[0][0] :]):
+            # Move the entry to the most recently used end
+            _match_cache[key] = cached
+            return cast(T, cached[2])
+
+    # Computed outside of the lock, so a concurrent miss may compute it twice
+    result = compute()
+    with _match_cache_lock:
+        if len(_match_cache) >= MATCH_CACHE_SIZE:
+            # Evict the least recently used entry
+            del _match_cache[next(iter(_match_cache))]
+        _match_cache[key] = (owner, fingerprint[1], result)
+    return result
+
+
+@functools.cache
+def _impl_uuid(module: str, name: str) -> UUID:
+    """Compute the stable UUID of a function from its module and name.
+
+    Args:
+        module: Module the function is defined in
+        name: Name of the function
+
+    Returns:
+        The uuid5 of the qualified name in the PyChoice namespace
+    """
+    return uuid5(UUID_NAMESPACE, f"{module}.{name}")
+
+
+@functools.lru_cache(maxsize=SIGNATURE_CACHE_SIZE)
+def _cached_signature(func: Callable[..., Any]) -> inspect.Signature:
+    """Get the signature of a callable, computing it only once per callable.
+
+    The cache holds its callables alive, so it is bounded to the most recently
+    inspected ones.
+
+    Args:
+        func: The callable to inspect
+
+    Returns:
+        The cached inspect.Signature of func
+    """
+    return inspect.signature(func)
+
+
+def _parameter_info(func: Callable[..., Any]) -> tuple[tuple[str, ...], bool, int | None, dict[str, Any]]:
+    """Describe the parameters of a callable.
+
+    Plain functions are described from their code object, which is much cheaper
+    than building an inspect.Signature. Other callables, and functions whose
+    signature is overridden by __wrapped__ or __signature__, use the signature.
+
+    Args:
+        func: The callable to describe
+
+    Returns:
+        Tuple of (names of the positional parameters, whether every parameter
+        is positional-or-keyword, most positional arguments a call can bind or
+        None if unlimited, defaults of the positional-or-keyword parameters
+        with inspect.Parameter.empty for the required ones)
+    """
+    if isinstance(func, types.FunctionType) and not hasattr(func, "__wrapped__") and not hasattr(func, "__signature__"):
+        code = func.__code__
+        positional = code.co_varnames[: code.co_argcount]
+        var_positional = bool(code.co_flags & inspect.CO_VARARGS)
+        var_keyword = bool(code.co_flags & inspect.CO_VARKEYWORDS)
+        simple = not (code.co_posonlyargcount or code.co_kwonlyargcount or var_positional or var_keyword)
+
+        # __defaults__ holds the defaults of the last positional parameters
+        values = func.__defaults__ or ()
+        first_default = len(positional) - len(values)
+        defaults = {
+            name: values[i - first_default] if i >= first_default else inspect.Parameter.empty
+            for i, name in enumerate(positional)
+            if i >= code.co_posonlyargcount
+        }
+        return positional, simple, None if var_positional else len(positional), defaults
+
+    params = _cached_signature(func).parameters.values()
+    positional = tuple(param.name for param in params if param.kind in _POSITIONAL_KINDS)
+    simple = all(param.kind == inspect.Parameter.POSITIONAL_OR_KEYWORD for param in params)
+    var_positional = any(param.kind == inspect.Parameter.VAR_POSITIONAL for param in params)
+    defaults = {param.name: param.default for param in params if param.kind == inspect.Parameter.POSITIONAL_OR_KEYWORD}
+    return positional, simple, None if var_positional else len(positional), defaults
+
+
+@dataclass(frozen=True, slots=True)
 class Rule:
     """Represents a choice rule that defines when and how to customize function behavior.
 
     A Rule combines a Selector (which defines when the rule applies) with an
     implementation and values (which define how to customize the behavior).
+    Rules are immutable once created.
 
     Attributes:
         selector: The Selector that determines when this rule matches
         impl: The ChoiceFuncImplementation to use, or None for parameter-only rules
         vals: Function that converts captures to implementation and values
         doc: Optional documentation string for the rule
+        uses_captures: Whether vals reads the captures. The captures of rules
+            that don't are only collected while tracing
 
     Example:
         ```python
@@ -49,6 +185,7 @@ class Rule:
     impl: ChoiceFuncImplementation | None
     vals: RuleVals
     doc: str | None = None
+    uses_captures: bool = True
 
     def __str__(self) -> str:
         if self.impl is not None:
@@ -56,6 +193,56 @@ class Rule:
         else:
             return f"{self.selector}"
 
+    def same_pattern(self, other: Rule) -> bool:
+        """Check if another rule has the same selector, implementation and values.
+
+        Such a rule always applies to the same calls with the same effect, so
+        only one of the two needs to be kept. The documentation is ignored.
+
+        Args:
+            other: The rule to compare with
+
+        Returns:
+            True if both rules are interchangeable
+        """
+        try:
+            return (
+                self.impl is other.impl
+                and self.selector.items == other.selector.items
+                and bool(self.vals == other.vals)
+            )
+        except Exception:
+            # Values that can not be compared are never considered equal
+            return False
+
+
+class StaticVals:
+    """Rule values that don't depend on the captures, as created by choice.rule().
+
+    Unlike a lambda, two StaticVals with the same implementation and values
+    compare equal, which allows duplicate rules to be detected.
+
+    Attributes:
+        impl: The implementation to use, or None for parameter-only rules
+        vals: The parameter values to apply
+    """
+
+    __slots__ = ("impl", "vals")
+
+    def __init__(self, impl: ChoiceFuncImplementation | None, vals: dict[str, Any]) -> None:
+        self.impl = impl
+        self.vals = vals
+
+    def __call__(self, captures: list[dict[str, Any]]) -> tuple[ChoiceFuncImplementation | None, dict[str, Any]]:
+        return self.impl, self.vals
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, StaticVals) and self.impl is other.impl and self.vals == other.vals
+
+    def __hash__(self) -> int:
+        # Values may be unhashable, so only hash their names
+        return hash((id(self.impl), frozenset(self.vals)))
+
 
 class MatchedRule:
     """Represents a rule that has been matched against a call stack.
@@ -69,6 +256,9 @@ class MatchedRule:
         impl: The resolved ChoiceFuncImplementation to use
         vals: The resolved parameter values to apply
 
+    The rule values function is only called when impl or vals is first
+    accessed, so matches that are never applied don't evaluate it.
+
     Example:
         ```python
         # When a rule matches, it becomes a MatchedRule
@@ -78,19 +268,42 @@ class MatchedRule:
         ```
     """
 
+    # _impl and _vals stay unset until the rule values are resolved
+    __slots__ = ("_impl", "_vals", "captures", "rule")
+
     def __init__(self, rule: Rule | None, captures: list[dict[str, Any]]) -> None:
         if rule is None:
-            rule = Rule(Selector([]), None, lambda c: None)
+            rule = _EMPTY_RULE
         self.rule = rule
         self.captures = captures
 
-        vals = rule.vals(captures)
-        if vals is not None:
-            self.impl: ChoiceFuncImplementation | None = vals[0]
-            self.vals: dict[str, Any] = vals[1]
-        else:
-            self.impl = None
-            self.vals = {}
+    def _compute_vals(self) -> None:
+        """Call the rule values function once and store its result."""
+        rule_vals = self.rule.vals
+        if type(rule_vals) is StaticVals:
+            # Read static values directly instead of calling through __call__
+            self._impl, self._vals = rule_vals.impl, rule_vals.vals
+            return
+        vals = rule_vals(self.captures)
+        self._impl, self._vals = (None, {}) if vals is None else vals
+
+    @property
+    def impl(self) -> ChoiceFuncImplementation | None:
+        """The resolved implementation, computed on first access."""
+        try:
+            return self._impl
+        except AttributeError:
+            self._compute_vals()
+            return self._impl
+
+    @property
+    def vals(self) -> dict[str, Any]:
+        """The resolved parameter values, computed on first access."""
+        try:
+            return self._vals
+        except AttributeError:
+            self._compute_vals()
+            return self._vals
 
 
 class MissingChoiceArg(Exception):
@@ -121,8 +334,9 @@ class Selector:
     when choice rules should be applied.
 
     Attributes:
-        items: List of SelectorItems that define the matching pattern
+        items: Tuple of SelectorItems that define the matching pattern
         impl: Implementation identifier string for display purposes
+        cacheable: True if every item is cacheable, so matches can be memoized
 
     Example:
         ```python
@@ -131,13 +345,23 @@ class Selector:
         ```
     """
 
-    def __init__(self, items: list[SelectorItem], impl: str = "") -> None:
-        self.items: list[SelectorItem] = items
+    __slots__ = ("cacheable", "impl", "items")
+
+    def __init__(self, items: Sequence[SelectorItem], impl: str = "") -> None:
+        self.items: tuple[SelectorItem, ...] = tuple(items)
         self.impl = impl
+        # Selectors built only for generic_compare may hold raw callables
+        self.cacheable = all(getattr(item, "cacheable", False) for item in items)
 
     def __str__(self) -> str:
         return f"{' '.join(str(i) for i in self.items)} => {self.impl}"
 
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Selector) and self.items == other.items and self.impl == other.impl
+
+    def __hash__(self) -> int:
+        return hash((self.items, self.impl))
+
     def choice_function(self) -> Any:
         """Get the choice function that this selector targets.
 
@@ -153,6 +377,10 @@ class Selector:
         Returns indices of selectors sorted from least specific (0) to most
         specific (-1). Non-matching selectors are excluded.
 
+        Each selector is matched against the stack once and ordered by its
+        specificity_key, which gives the same order as pairwise compare() calls
+        without re-walking the stack for every comparison.
+
         Args:
             selectors: List of selectors to sort
 
@@ -161,21 +389,27 @@ class Selector:
         """
         if not selectors:
             return []
-        stack_info = inspect.stack()
+        stack_info = current_stack()
 
-        # Get indices and filter to only matching
-        indices = [i for i, matches in enumerate(Selector.all_matches(selectors, stack_info)) if matches]
+        # Get keys and filter to only matching
+        keyed = [
+            (Selector.specificity_key(positions), i)
+            for i, positions in enumerate(Selector._all_match_positions(selectors, stack_info))
+            if positions is not None
+        ]
 
-        def compare(a: int, b: int) -> int:
-            return selectors[a].compare(selectors[b], stack_info)
-
-        # Sort
-        return sorted(indices, key=cmp_to_key(compare))
+        # Sort, using the index as tie breaker to keep the sort stable
+        return [i for _, i in sorted(keyed)]
 
     @staticmethod
     def all_matches(selectors: list[Selector], stack_info: OptStackFrame = None) -> list[bool]:
         """Check which selectors match the current call stack.
 
+        Selectors are bucketed by their key item (the last item, usually the
+        choice function). Each distinct key item is searched for in the stack
+        only once, and selectors whose key item never matches are rejected
+        without walking the rest of their items.
+
         Args:
             selectors: List of selectors to check
             stack_info: Optional stack frames, uses current stack if None
@@ -186,12 +420,73 @@ class Selector:
         if not selectors:
             return []
         if stack_info is None:
-            stack_info = inspect.stack()
-        return [selector.matches(stack_info) is not None for selector in selectors]
+            stack_info = current_stack()
+        return [positions is not None for positions in Selector._all_match_positions(selectors, stack_info)]
 
-    def matches(self, stack_info: OptStackFrame = None, rule: Rule | None = None) -> MatchedRule | None:
+    @staticmethod
+    def _all_match_positions(selectors: list[Selector], stack_info: StackFrame) -> list[tuple[int, ...] | None]:
+        """Find the match_positions of many selectors, bucketed by key item.
+
+        Args:
+            selectors: List of selectors to check
+            stack_info: Stack frames to match against
+
+        Returns:
+            The match_positions of each selector, or None for non-matching ones
+        """
+        # Group selector indices by key item
+        results: list[tuple[int, ...] | None] = [None] * len(selectors)
+        buckets: list[tuple[SelectorItem, list[int]]] = []
+        for i, selector in enumerate(selectors):
+            if not selector.items:
+                # Empty selector always matches
+                results[i] = ()
+                continue
+            key = selector.items[-1]
+            for bucket_key, indices in buckets:
+                if bucket_key == key:
+                    indices.append(i)
+                    break
+            else:
+                buckets.append((key, [i]))
+
+        for key, indices in buckets:
+            start = next((j for j, frame_info in enumerate(stack_info) if key.matches(frame_info)), None)
+            if start is None:
+                # Key item is not on the stack so no selector in the bucket can match
+                continue
+            for i in indices:
+                positions = selectors[i].match_positions(stack_info[start:])
+                if positions is not None:
+                    results[i] = tuple(p + start for p in positions)
+        return results
+
+    @staticmethod
+    def specificity_key(positions: tuple[int, ...]) -> tuple[int, ...]:
+        """Convert match positions into a sort key ordered by specificity.
+
+        compare() walks the stack from the innermost frame and prefers the
+        selector that matches a frame the other one skips, or the longer
+        selector when one runs out of items first. That is a lexicographic order
+        on the matched frame indices from the innermost item outwards, where a
+        lower frame index is more specific. Negating the indices turns it into
+        plain tuple ordering, with the most specific selector sorting last.
+
+        Args:
+            positions: Result of match_positions for a matching selector
+
+        Returns:
+            Key where larger means more specific
+        """
+        return tuple(-p for p in reversed(positions))
+
+    def matches(self, stack_info: FrameIter | None = None, rule: Rule | None = None) -> MatchedRule | None:
         """Check if this selector matches the given call stack.
 
+        Frames are consumed in order and matching stops as soon as the outermost
+        selector item matches, so a lazy iterator of frames is only walked as far
+        as needed.
+
         Args:
             stack_info: Stack frames to match against, uses current if None
             rule: Associated rule for creating MatchedRule
@@ -200,64 +495,122 @@ class Selector:
             MatchedRule if selector matches, None otherwise
         """
         if stack_info is None:
-            stack_info = inspect.stack()
+            stack_info = iter_stack()
         if len(self.items) == 0:
             # Empty selector always matches
-            return MatchedRule(rule, [])
+            return _EMPTY_MATCHED_RULE if rule is None else MatchedRule(rule, [])
 
-        captures = []
-        selector_index = len(self.items) - 1
+        if isinstance(stack_info, (list, tuple, FrameStack)) and len(self.items) > len(stack_info):
+            # Every item needs its own frame
+            return None
+
+        items = self.items
+        selector_index = len(items) - 1
+        captures: list[dict[str, Any]] = [{}] * len(items)
+        item = items[selector_index]
         for frame_info in stack_info:
-            if self.items[selector_index].matches(frame_info):
-                captures.append(Selector._collect_captures(self.items[selector_index], frame_info))
+            if item.matches(frame_info):
+                # Fill the captures in item order as items match from the last one
+                captures[selector_index] = Selector._collect_captures(item, frame_info)
                 if selector_index == 0:
-                    return MatchedRule(rule, list(reversed(captures)))
+                    return MatchedRule(rule, captures)
                 else:
                     # More selector components
                     selector_index = selector_index - 1
+                    item = items[selector_index]
+        return None
+
+    def match_positions(self, stack_info: FrameIter) -> tuple[int, ...] | None:
+        """Find the stack frames matched by each selector item.
+
+        Args:
+            stack_info: Stack frames to match against
+
+        Returns:
+            Tuple holding the index of the frame matched by each item (in item
+            order), or None if the selector does not match
+        """
+        items = self.items
+        if len(items) == 0:
+            return ()
+        if isinstance(stack_info, (list, tuple, FrameStack)) and len(items) > len(stack_info):
+            # Every item needs its own frame
+            return None
+
+        # Hot loop: keep the current item's bound matches method in a local
+        positions = []
+        selector_index = len(items) - 1
+        item_matches = items[selector_index].matches
+        for i, frame_info in enumerate(stack_info):
+            if item_matches(frame_info):
+                positions.append(i)
+                if selector_index == 0:
+                    return tuple(reversed(positions))
+                selector_index = selector_index - 1
+                item_matches = items[selector_index].matches
         return None
 
     @staticmethod
-    def _collect_captures(item: SelectorItem, frame_info: inspect.FrameInfo) -> dict[str, Any]:
+    def clear_match_cache() -> None:
+        """Clear the memoized selector match results."""
+        with _match_cache_lock:
+            _match_cache.clear()
+
+    @staticmethod
+    def _collect_captures(
+        item: SelectorItem, frame_info: FrameView, keys: Collection[str] | None = None
+    ) -> dict[str, Any]:
         """Collect variable captures from a matching stack frame.
 
+        If the item declares capture_keys, only those variables are collected
+        instead of copying every local of the frame.
+
         Args:
             item: The SelectorItem that matched
             frame_info: The stack frame that was matched
+            keys: Names to collect instead of the item's capture_keys
 
         Returns:
             Dictionary of captured local variables
         """
-        # Import Match here to avoid circular imports
-        from .funcs import CallableSelectorItem, ChoiceFunction
-
         # Capture logic moved from Match.capture
         local_vars = frame_info.frame.f_locals
+        if keys is None:
+            keys = item.capture_keys
 
         # Check if we're in a ChoiceFunction.__call__ context
-        if isinstance(item, CallableSelectorItem) and isinstance(item.func, ChoiceFunction):
+        if item.captures_call_arguments:
             choice_func = local_vars["self"]
             args = local_vars.get("args", ())
             kwargs = local_vars.get("kwargs", {})
-
-            # Get the signature of the actual function
-            sig = inspect.signature(choice_func.interface.func)
-
-            # Bind the arguments to get the actual parameter values
-            try:
-                bound_args = sig.bind(*args, **kwargs)
-                bound_args.apply_defaults()
-
-                # Return only the requested match_args
-                return dict(bound_args.arguments)
-            except Exception:  # noqa: S110
-                # Fall back to original behavior if binding fails
-                pass
+            interface: ChoiceFuncImplementation[Any] = choice_func.interface
+
+            if interface._simple_params:
+                # Index the arguments directly instead of binding the signature.
+                # If they don't fit, binding would fail as well
+                captured = interface._capture_arguments(args, kwargs, keys)
+                if captured is not None:
+                    return captured
+            elif interface._max_positional is None or len(args) <= interface._max_positional:
+                # Bind the arguments with the signature cached on the interface
+                try:
+                    bound_args = interface._sig.bind(*args, **kwargs)
+                    bound_args.apply_defaults()
+
+                    # Return only the requested match_args
+                    if keys is not None:
+                        return {k: v for k, v in bound_args.arguments.items() if k in keys}
+                    return dict(bound_args.arguments)
+                except Exception:  # noqa: S110
+                    # Fall back to original behavior if binding fails
+                    pass
 
         # Original behavior for regular functions
+        if keys is not None:
+            return {k: local_vars[k] for k in keys if k in local_vars}
         return dict(local_vars)
 
-    def compare(self, other: Selector, stack_info: StackFrame) -> int:
+    def compare(self, other: Selector, stack_info: FrameIter) -> int:
         """Compare selector specificity for a given call stack.
 
         Args:
@@ -324,6 +677,211 @@ class Selector:
         return 0
 
 
+def _merge_vals(rules: list[MatchedRule]) -> dict[str, Any]:
+    """Merge the values of matched rules, with later rules taking precedence.
+
+    The first rule's values are copied, which allocates the result at its size
+    in one step, and the others are merged into it in place.
+
+    Args:
+        rules: Non-empty list of matched rules
+
+    Returns:
+        A new dict with the merged values
+    """
+    it = iter(rules)
+    merged = next(it).vals.copy()
+    for r in it:
+        merged |= r.vals
+    return merged
+
+
+def _no_vals(captures: list[dict[str, Any]]) -> None:
+    """Rule values for the empty rule, which never overrides anything."""
+    return None
+
+
+_EMPTY_RULE = Rule(Selector([]), None, _no_vals)
+"""Shared placeholder rule for MatchedRules created without a rule."""
+
+_EMPTY_MATCHED_RULE = MatchedRule(None, [])
+"""Shared result of matching an empty selector without a rule. Treat as read-only."""
+
+
+@dataclass(slots=True)
+class RegistryNode:
+    """A node of a RuleTrie.
+
+    Attributes:
+        item: The SelectorItem matched on the edge into this node (None for the root)
+        code: The code object the item requires, see SelectorItem.code
+        children: Child nodes keyed by their SelectorItem
+        rules: Indices of the rules whose selector ends at this node
+    """
+
+    item: SelectorItem | None
+    code: types.CodeType | None = None
+    children: dict[Any, RegistryNode] = field(default_factory=dict)
+    rules: list[int] = field(default_factory=list)
+
+
+class RuleTrie:
+    """A shared matching network for the selectors of a list of rules.
+
+    Selectors are stored right to left, so the key item of each selector hangs
+    off the root and selectors ending in the same items share a path. Since
+    selector items are matched greedily from the innermost frame outwards, the
+    frame matched by a node only depends on the path leading to it. Rules that
+    share a suffix therefore share the matching work, in the style of the
+    alpha network of a RETE matcher.
+
+    Attributes:
+        rules: Snapshot of the rules in the trie, in registration order
+        root: The root RegistryNode
+        cacheable: Whether all selectors are cacheable, so match results only
+            depend on the stack fingerprint
+
+    Example:
+        ```python
+        trie = RuleTrie(greet.rules)
+        for index, positions in trie.match(current_stack()):
+            print(trie.rules[index], positions)
+        ```
+    """
+
+    def __init__(self, rules: Sequence[Rule]) -> None:
+        # Frozen so that later changes to the rule list can't desync the indices
+        self.rules: tuple[Rule, ...] = tuple(rules)
+        self.root = RegistryNode(None)
+        self.cacheable = all(rule.selector.cacheable for rule in self.rules)
+        # Identity of the reusable static MatchedRules in the match cache
+        self._static_token = object()
+        for index, rule in enumerate(self.rules):
+            node = self.root
+            for item in reversed(rule.selector.items):
+                key = RuleTrie._node_key(item)
+                child = node.children.get(key)
+                if child is None:
+                    child = node.children[key] = RegistryNode(item, getattr(item, "code", None))
+                node = child
+            node.rules.append(index)
+
+    @staticmethod
+    def _node_key(item: SelectorItem) -> Any:
+        """Key used to share a trie edge between equal selector items.
+
+        Items that are not hashable fall back to identity.
+        """
+        try:
+            hash(item)
+        except TypeError:
+            return id(item)
+        return item
+
+    def match(
+        self, stack_info: StackFrame, fingerprint: StackFingerprint | None = None
+    ) -> list[tuple[int, tuple[int, ...]]]:
+        """Match every rule of the trie against a call stack.
+
+        Args:
+            stack_info: Stack frames to match against
+            fingerprint: Optional stack_fingerprint() of stack_info, used to
+                memoize the result when the trie is cacheable
+
+        Returns:
+            List of (rule index, match positions) for the matching rules, sorted
+            from least to most specific with ties in rule order. The positions
+            are the same as Selector.match_positions
+        """
+        if fingerprint is not None and self.cacheable:
+            return _memoize_match(self, fingerprint, lambda: self._match(stack_info))
+        return self._match(stack_info)
+
+    def match_rules(
+        self, stack_info: StackFrame, fingerprint: StackFingerprint | None = None, collect_static: bool = False
+    ) -> list[MatchedRule]:
+        """Match every rule of the trie against a call stack and resolve the matches.
+
+        When every matching rule is static (doesn't use its captures) and
+        static captures are not requested, the MatchedRules themselves are
+        memoized per stack fingerprint and shared between calls.
+
+        Args:
+            stack_info: Stack frames to match against
+            fingerprint: Optional stack_fingerprint() of stack_info, used to
+                memoize the result when the trie is cacheable
+            collect_static: Whether to also collect the captures of static
+                rules, for example to show them in a trace
+
+        Returns:
+            List of MatchedRules sorted from least to most specific. It may be
+            shared between calls, so it should not be mutated
+        """
+        if fingerprint is not None and self.cacheable and not collect_static:
+            static = _memoize_match(
+                self._static_token, fingerprint, lambda: self._static_rules(stack_info, fingerprint)
+            )
+            if static is not None:
+                return static
+        return self._resolve(self.match(stack_info, fingerprint), stack_info, collect_static)
+
+    def _static_rules(self, stack_info: StackFrame, fingerprint: StackFingerprint) -> list[MatchedRule] | None:
+        matches = self.match(stack_info, fingerprint)
+        if any(self.rules[index].uses_captures for index, _ in matches):
+            return None
+        return self._resolve(matches, stack_info, False)
+
+    def _resolve(
+        self, matches: list[tuple[int, tuple[int, ...]]], stack_info: StackFrame, collect_static: bool
+    ) -> list[MatchedRule]:
+        collect = Selector._collect_captures
+        rules = self.rules
+        resolved = []
+        for index, positions in matches:
+            r = rules[index]
+            if r.uses_captures or collect_static:
+                captures = [collect(item, stack_info[p]) for item, p in zip(r.selector.items, positions)]
+            else:
+                # Static rules ignore their captures
+                captures = []
+            resolved.append(MatchedRule(r, captures))
+        return resolved
+
+    def _match(self, stack_info: StackFrame) -> list[tuple[int, tuple[int, ...]]]:
+        root = self.root
+        # Matches as (specificity key, rule index, positions), see Selector.specificity_key
+        keyed: list[tuple[tuple[int, ...], int, tuple[int, ...]]] = [((), index, ()) for index in root.rules]
+        frame_count = len(stack_info)
+        # Nodes tied to a code object that is not on the stack can never match,
+        # so they are rejected without scanning the frames
+        if isinstance(stack_info, FrameStack):
+            # Read the raw frames so no FrameView is built for them
+            stack_codes = {id(frame.f_code) for frame in stack_info.frames}
+        else:
+            stack_codes = {id(frame_info.frame.f_code) for frame_info in stack_info}
+
+        # Each pending entry holds a node, the first frame it may match and the
+        # positions matched by its ancestors (innermost first)
+        pending: list[tuple[RegistryNode, int, tuple[int, ...]]] = [(child, 0, ()) for child in root.children.values()]
+        while pending:
+            node, start, path = pending.pop()
+            if node.code is not None and id(node.code) not in stack_codes:
+                continue
+            item_matches = cast(SelectorItem, node.item).matches
+            for i in range(start, frame_count):
+                if item_matches(stack_info[i]):
+                    path_i = (*path, i)
+                    if node.rules:
+                        key = tuple(-p for p in path_i)
+                        positions = path_i[::-1]
+                        keyed.extend((key, index, positions) for index in node.rules)
+                    pending.extend((child, i + 1, path_i) for child in node.children.values())
+                    break
+        if len(keyed) > 1:
+            keyed.sort()
+        return [(index, positions) for _, index, positions in keyed]
+
+
 class ChoiceFuncImplementation[O]:
     """Implementation wrapper for choice functions.
 
@@ -353,15 +911,11 @@ class ChoiceFuncImplementation[O]:
         Raises:
             MissingChoiceArg: If any choice_arg is not a parameter of func
         """
-        self.id = uuid5(UUID_NAMESPACE, f"{func.__module__}.{func.__name__}")
         self.func: Callable[..., O] = func
 
         # Collect args
-        sig = inspect.signature(func)
-        defaults = {}
-        for param in sig.parameters.values():
-            if param.kind == inspect.Parameter.POSITIONAL_OR_KEYWORD:
-                defaults[param.name] = param.default
+        self._param_order, self._simple_params, self._max_positional, defaults = _parameter_info(func)
+        self._merge_cache: dict[tuple[int, ...], tuple[tuple[Rule, ...], dict[str, Any]]] = {}
 
         # Validate args
         for choice_arg in choice_args:
@@ -369,7 +923,59 @@ class ChoiceFuncImplementation[O]:
                 raise MissingChoiceArg(func, choice_arg)
         self.defaults = defaults
 
-    def choice_kwargs(self, rules: list[MatchedRule], args: tuple[Any, ...], kwargs: dict[str, Any]) -> dict[str, Any]:
+    @functools.cached_property
+    def _sig(self) -> inspect.Signature:
+        """Signature of the function, only built when arguments must be bound."""
+        return _cached_signature(self.func)
+
+    @functools.cached_property
+    def id(self) -> UUID:
+        """Unique identifier for this implementation, computed on first access."""
+        return _impl_uuid(self.func.__module__, self.func.__name__)
+
+    def _capture_arguments(
+        self, args: tuple[Any, ...], kwargs: dict[str, Any], keys: Collection[str] | None = None
+    ) -> dict[str, Any] | None:
+        """Collect the arguments of a call without binding the full signature.
+
+        Only valid when every parameter is positional-or-keyword, in which case
+        each parameter is either the next positional argument, a keyword
+        argument or its default.
+
+        Args:
+            args: Positional arguments of the call
+            kwargs: Keyword arguments of the call
+            keys: Names of the parameters to collect, or None for all of them
+
+        Returns:
+            Dictionary with the value of each requested parameter, including
+            defaults, or None if the arguments don't fit the signature
+        """
+        param_order = self._param_order
+        if len(args) > len(param_order):
+            return None
+        captured = {}
+        from_kwargs = 0
+        for i, name in enumerate(param_order):
+            if i < len(args):
+                value = args[i]
+            elif name in kwargs:
+                value = kwargs[name]
+                from_kwargs += 1
+            else:
+                value = self.defaults[name]
+                if value is inspect.Parameter.empty:
+                    return None
+            if keys is None or name in keys:
+                captured[name] = value
+        if from_kwargs != len(kwargs):
+            # Unknown keyword or one also given positionally
+            return None
+        return captured
+
+    def choice_kwargs(
+        self, rules: list[MatchedRule], args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> Mapping[str, Any]:
         """Merge rule values with provided kwargs.
 
         Args:
@@ -378,14 +984,42 @@ class ChoiceFuncImplementation[O]:
             kwargs: Keyword arguments from the call
 
         Returns:
-            Merged dictionary of keyword arguments with rule values applied
+            Merged keyword arguments with rule values applied. When there is
+            nothing to merge, this is a read-only view of kwargs or of the rule
+            values rather than a copy
         """
-        new_kwargs = {}
-        for r in rules:
-            new_kwargs.update(r.vals)
-        new_kwargs.update(kwargs)
+        if not rules:
+            return types.MappingProxyType(kwargs)
+        if len(rules) == 1:
+            vals = rules[0].vals
+            return {**vals, **kwargs} if kwargs else types.MappingProxyType(vals)
+        if all(not r.rule.uses_captures for r in rules):
+            # Values of static rules never change, so their merge can be reused
+            merged = self._merged_static_vals(rules)
+            return {**merged, **kwargs} if kwargs else types.MappingProxyType(merged)
+        new_kwargs = _merge_vals(rules)
+        new_kwargs |= kwargs
         return new_kwargs
 
+    def _merged_static_vals(self, rules: list[MatchedRule]) -> dict[str, Any]:
+        """Merge the values of rules that don't use their captures, memoized.
+
+        Args:
+            rules: List of matched static rules to apply
+
+        Returns:
+            The merged rule values, shared between calls so it must not be mutated
+        """
+        key = tuple(id(r.rule) for r in rules)
+        cached = self._merge_cache.get(key)
+        if cached is None:
+            merged = _merge_vals(rules)
+            if len(self._merge_cache) >= MERGE_CACHE_SIZE:
+                self._merge_cache.clear()
+            # Keep the rules alive so their ids can not be reused while cached
+            cached = self._merge_cache[key] = (tuple(r.rule for r in rules), merged)
+        return cached[1]
+
     def __call__(self, rules: list[MatchedRule], args: tuple[Any, ...], kwargs: dict[str, Any]) -> O:
         """Execute the implementation with rule-modified parameters.
 
@@ -397,6 +1031,11 @@ class ChoiceFuncImplementation[O]:
         Returns:
             Result of calling the wrapped function with modified parameters
         """
+        if not rules:
+            # Nothing to merge, call straight through
+            if not kwargs:
+                return self.func(*args)
+            return self.func(*args, **kwargs)
         return self.func(*args, **self.choice_kwargs(rules, args, kwargs))
 
     def __str__(self) -> str:
@@ -9,13 +9,14 @@ from __future__ import annotations
 
 import functools
 import inspect
-import io
 import json
-from functools import cmp_to_key
+import threading
+from collections.abc import Mapping
+from dataclasses import replace
 from typing import Any, Callable, TypeVar, cast
-from uuid import UUID, uuid5
+from uuid import UUID
 
-from .args import UUID_NAMESPACE, ChoiceFuncImplementation, MatchedRule, Rule, RuleVals, Selector
+from .args import ChoiceFuncImplementation, MatchedRule, Rule, RuleTrie, RuleVals, Selector, StaticVals
 from .selector import (
     SEL,
     SEL_I,
@@ -23,10 +24,14 @@ from .selector import (
     ChoiceContext,
     ChoiceContextSelectorItem,
     ClassSelectorItem,
+    FrameView,
     FunctionSelectorItem,
     InvalidSelectorItem,
     OptStackFrame,
     SelectorItem,
+    StackFrame,
+    current_stack,
+    stack_fingerprint,
 )
 
 F = TypeVar("F", bound=Callable[..., Any])
@@ -53,6 +58,10 @@ class Match(SelectorItem):
     def __init__(self, func: SEL_I, **kwargs: Any):
         self.item = new_selector_item(func)
         self.match_kwargs = kwargs
+        # Argument values vary between calls from the same stack
+        self.cacheable = not kwargs and self.item.cacheable
+        self.captures_call_arguments = self.item.captures_call_arguments
+        self.code = self.item.code
 
     def __str__(self) -> str:
         return str(self.item)
@@ -60,11 +69,15 @@ class Match(SelectorItem):
     def __eq__(self, other: object) -> bool:
         return isinstance(other, Match) and self.item == other.item and self.match_kwargs == other.match_kwargs
 
+    def __hash__(self) -> int:
+        # Argument values may be unhashable, so only hash their names
+        return hash((self.item, frozenset(self.match_kwargs)))
+
     def get_callable(self) -> Callable[..., Any] | None:
         """Get the underlying callable from the wrapped selector item."""
         return self.item.get_callable()
 
-    def matches(self, frame_info: inspect.FrameInfo) -> bool:
+    def matches(self, frame_info: FrameView) -> bool:
         """Check if this Match selector matches a stack frame.
 
         First checks if the underlying item matches, then verifies that
@@ -84,17 +97,44 @@ class Match(SelectorItem):
         if not self.match_kwargs:
             return True
 
-        # Capture the arguments and compare against expected kwargs
-        captured = self.capture(frame_info)
+        if self.item.captures_call_arguments:
+            # Resolve only the matched names from the choice function call arguments
+            values = Selector._collect_captures(self.item, frame_info, self.match_kwargs)
+        else:
+            # Read the matched names straight from the frame rather than copying every local
+            values = frame_info.frame.f_locals
 
-        # Check if all expected kwargs match the captured values
+        # Check if all expected kwargs match, stopping at the first mismatch
         for key, expected_value in self.match_kwargs.items():
-            if key not in captured or captured[key] != expected_value:
+            if key not in values or values[key] != expected_value:
                 return False
 
         return True
 
-    def capture(self, frame_info: inspect.FrameInfo) -> dict[str, Any]:
+    def with_captures(self, *keys: str) -> Match:
+        """Restrict the variables captured for rules to the given names.
+
+        By default every local variable (or every argument of a choice function)
+        of the matched frame is copied into the rule captures. Declaring the
+        names a rule actually reads avoids that copy.
+
+        Args:
+            *keys: Names of the variables to capture
+
+        Returns:
+            This Match, for chaining
+
+        Example:
+            ```python
+            @choice.def_rule([choice.Match(wrap_greet).with_captures("name"), greet])
+            def greet_rule(captures):
+                return greet, {"greeting": f"Hi {captures[0]['name']}"}
+            ```
+        """
+        self.capture_keys = frozenset(keys)
+        return self
+
+    def capture(self, frame_info: FrameView) -> dict[str, Any]:
         """Capture local variables from the matching stack frame.
 
         Args:
@@ -179,22 +219,25 @@ class TraceItem:
         func: The ChoiceFunction that was called
         impl: The ChoiceFuncImplementation that was executed
         rules: List of MatchedRules that applied to this call
-        stack_info: Call stack information at time of invocation
+        stack_info: (function, filename, lineno) of each stack frame at time of invocation
         args: Positional arguments passed to the function
         kwargs: Keyword arguments passed to the function
         choice_kwargs: Final keyword arguments after rule application
         items: List of nested TraceItems for sub-calls
+        parent: The enclosing TraceItem while the call is being traced
     """
 
+    __slots__ = ("args", "choice_kwargs", "func", "impl", "items", "kwargs", "parent", "rules", "stack_info")
+
     def __init__(
         self,
         func: ChoiceFunction,
         impl: ChoiceFuncImplementation,
         rules: list[MatchedRule],
-        stack_info: list[inspect.FrameInfo],
+        stack_info: StackFrame,
         args: tuple[Any, ...],
         kwargs: dict[str, Any],
-        choice_kwargs: dict[str, Any],
+        choice_kwargs: Mapping[str, Any],
     ) -> None:
         """Initialize a TraceItem with complete call context.
 
@@ -202,7 +245,8 @@ class TraceItem:
             func: The ChoiceFunction that was invoked
             impl: The implementation that was selected and executed
             rules: List of rules that matched and applied
-            stack_info: Call stack frames at time of invocation
+            stack_info: Call stack frames at time of invocation. Only their
+                location is kept so the trace doesn't keep the frames alive
             args: Positional arguments to the function
             kwargs: Original keyword arguments
             choice_kwargs: Final keyword arguments after rule processing
@@ -210,30 +254,34 @@ class TraceItem:
         self.func = func
         self.impl = impl
         self.rules = rules
-        self.stack_info = stack_info
+        self.stack_info = [(fi.function, fi.filename, fi.lineno) for fi in stack_info]
         self.args = args
         self.kwargs = kwargs
         self.choice_kwargs = choice_kwargs
         self.items: list[TraceItem] = []
+        self.parent: TraceItem | None = None
 
-    def print_item(self, sb: io.TextIOBase, indent: int = 0) -> None:
+    def print_item(self, parts: list[str], indent: int = 0) -> None:
         """Print formatted representation of this trace item.
 
         Args:
-            sb: Text buffer to write output to
+            parts: List of output lines to append to, joined by the caller
             indent: Indentation level for nested display
         """
         prefix = " " * indent
         rule_str = " -> ".join(str(r) for r in self.rules) or "No rules"
-        sb.write(f"{prefix}{self.func.interface.func.__name__} [{self.impl.func.__name__}]")
-        sb.write(f"{prefix}  Args: {self.args}, Kwargs: {self.kwargs}, Choice Kwargs: {self.choice_kwargs}")
-        sb.write(f"{prefix}  Rules: {rule_str}")
+        parts.append(f"{prefix}{self.func.interface.func.__name__} [{self.impl.func.__name__}]\n")
+        parts.append(f"{prefix}  Args: {self.args}, Kwargs: {self.kwargs}, Choice Kwargs: {dict(self.choice_kwargs)}\n")
+        parts.append(f"{prefix}  Rules: {rule_str}\n")
         for sub_item in self.items:
-            sub_item.print_item(sb, indent + 2)
+            sub_item.print_item(parts, indent + 2)
 
     def to_dict(self) -> dict[str, Any]:
         """Convert trace item to dictionary representation.
 
+        Like the rules, nested items are left for ChoiceJSONEncoder to convert,
+        so a dump encodes one item at a time instead of the whole tree up front.
+
         Returns:
             Dictionary representation suitable for JSON serialization
         """
@@ -241,11 +289,11 @@ class TraceItem:
             "func": str(self.func.id),
             "impl": str(self.impl.id),
             "rules": self.rules,
-            "stack_info": [f"{fi.function} at {fi.filename}:{fi.lineno}" for fi in self.stack_info],
+            "stack_info": [f"{function} at {filename}:{lineno}" for function, filename, lineno in self.stack_info],
             "args": [str(a) for a in self.args],
             "kwargs": {k: str(v) for k, v in self.kwargs.items()},
             "choice_kwargs": {k: str(v) for k, v in self.choice_kwargs.items()},
-            "items": [item.to_dict() for item in self.items],
+            "items": self.items,
         }
 
 
@@ -257,12 +305,15 @@ class Tracing:
 
     Attributes:
         items: Completed top-level trace items
-        stack: Current stack of active trace items
+        current: Innermost active trace item, linked to the enclosing ones
+            through their parent
     """
 
+    __slots__ = ("current", "items")
+
     def __init__(self) -> None:
         self.items: list[TraceItem] = []
-        self.stack: list[TraceItem] = []
+        self.current: TraceItem | None = None
 
     def begin(self, item: TraceItem) -> None:
         """Begin tracing a new choice function call.
@@ -270,7 +321,8 @@ class Tracing:
         Args:
             item: TraceItem for the function call being started
         """
-        self.stack.append(item)
+        item.parent = self.current
+        self.current = item
 
     def end(self) -> None:
         """End tracing the most recent choice function call.
@@ -278,13 +330,14 @@ class Tracing:
         Raises:
             MismatchedTrace: If there are no active calls to end
         """
-        if not self.stack:
+        ended = self.current
+        if ended is None:
             raise MismatchedTrace()
-        elif len(self.stack) == 1:
-            self.items.append(self.stack.pop())
+        parent = self.current = ended.parent
+        if parent is None:
+            self.items.append(ended)
         else:
-            ended = self.stack.pop()
-            self.stack[-1].items.append(ended)
+            parent.items.append(ended)
 
 
 class Trace:
@@ -306,15 +359,17 @@ class Trace:
         ```
     """
 
+    __slots__ = ("items",)
+
     def __init__(self, tracing: Tracing) -> None:
         self.items = tracing.items
 
     def __str__(self) -> str:
-        sb = io.StringIO()
+        parts: list[str] = []
         for item in self.items:
-            item.print_item(sb, 0)
+            item.print_item(parts, 0)
 
-        return sb.getvalue()
+        return "".join(parts)
 
     def save(self, filename: str) -> None:
         """Save trace to JSON file for analysis.
@@ -342,6 +397,8 @@ class TraceStatus:
         trace: Current active Tracing instance, or None if not tracing
     """
 
+    __slots__ = ("trace",)
+
     def __init__(self) -> None:
         self.trace: Tracing | None = None
 
@@ -399,6 +456,10 @@ class MismatchedTrace(RuntimeError):
         super().__init__("Mismatched choice Trace end call")
 
 
+_NO_MATCHES: list[MatchedRule] = []
+"""Shared result for calls that match no rules. Treat as read-only."""
+
+
 class ChoiceFunction[O]:
     """The core choice function that manages rules and dispatches to implementations.
 
@@ -428,14 +489,20 @@ class ChoiceFunction[O]:
         Args:
             interface: The default ChoiceFuncImplementation to use
         """
-        self.id = uuid5(UUID_NAMESPACE, f"{interface.func.__module__}.{interface.func.__name__}")
         self.interface: ChoiceFuncImplementation[O] = interface
         self.funcs: dict[UUID, ChoiceFuncImplementation[O]] = {}
         self.rules: list[Rule] = []
+        self._trie: RuleTrie | None = None
+        self._rules_lock = threading.Lock()
 
     def __str__(self) -> str:
         return f"ChoiceFunction({self.interface.func.__name__})"
 
+    @property
+    def id(self) -> UUID:
+        """Unique identifier for this choice function, shared with its interface."""
+        return self.interface.id
+
     def _add_func(self, f: Callable[..., Any], func: ChoiceFuncImplementation[O]) -> None:
         """Add an alternative implementation to this choice function.
 
@@ -448,10 +515,24 @@ class ChoiceFunction[O]:
     def _add_rule(self, rule: Rule) -> None:
         """Add a rule to this choice function.
 
+        An existing rule with the same pattern is replaced, so registering the
+        same rule repeatedly doesn't grow the rules to match. If the new rule
+        has no doc, the doc of the replaced rule is kept.
+
         Args:
             rule: The Rule to add to the rule list
         """
-        self.rules.append(rule)
+        with self._rules_lock:
+            for i, existing in enumerate(self.rules):
+                if existing.same_pattern(rule):
+                    # The later registration wins ties, so keep its position
+                    del self.rules[i]
+                    if rule.doc is None and existing.doc is not None:
+                        rule = replace(rule, doc=existing.doc)
+                    break
+            self.rules.append(rule)
+            self._trie = None
+        Selector.clear_match_cache()
 
     def _sorted_selectors(self, stack_info: OptStackFrame = None) -> list[MatchedRule]:
         """Get matching rules sorted by specificity.
@@ -460,54 +541,90 @@ class ChoiceFunction[O]:
             stack_info: Optional stack frames, uses current stack if None
 
         Returns:
-            List of MatchedRules sorted from least to most specific
+            List of MatchedRules sorted from least to most specific. It may be
+            shared between calls, so it should not be mutated
         """
         if not self.rules:
-            return []
+            return _NO_MATCHES
         if stack_info is None:
-            stack_info = inspect.stack()
+            stack_info = current_stack()
+
+        trie = self._trie
+        if trie is None:
+            # Rebuilt lazily after the rules change. Building under the rules
+            # lock keeps a concurrent _add_rule from being overwritten by a
+            # trie of the old rules
+            with self._rules_lock:
+                trie = self._trie
+                if trie is None:
+                    trie = self._trie = RuleTrie(self.rules)
+
+        # Match all rules at once, sorted by specificity. The captures of static
+        # rules are only shown in traces
+        tracing = trace_status.trace is not None
+        # The fingerprint is only used to memoize the matches of cacheable tries
+        fingerprint = stack_fingerprint(stack_info) if trie.cacheable else None
+        return trie.match_rules(stack_info, fingerprint, collect_static=tracing)
+
+    def _select_impl(self, rules: list[MatchedRule]) -> tuple[ChoiceFuncImplementation[O], list[MatchedRule]]:
+        """Choose the implementation to call from the matched rules.
 
-        # Get indices and filter to only matching
-        rules = []
-        for r in self.rules:
-            matched_rule = r.selector.matches(stack_info, r)
-            if matched_rule is not None:
-                rules.append(matched_rule)
-        if not rules:
-            return []
+        Args:
+            rules: Matched rules sorted from least to most specific
 
-        def compare(a: MatchedRule, b: MatchedRule) -> int:
-            return a.rule.selector.compare(b.rule.selector, stack_info)
+        Returns:
+            Tuple of the implementation of the most specific rule that sets
+            one (or the interface) and the rules that apply to it
 
-        # Sort
-        rules = sorted(rules, key=cmp_to_key(compare))
+        Raises:
+            NonRule: If a rule chose something that is not an implementation
+        """
+        # Single pass from the most specific rule: pick the implementation and
+        # prune the arg overrides of other implementations
+        impl: Any = None
+        kept = []
+        for r in reversed(rules):
+            rule_impl = r.rule.impl
+            if rule_impl is None:
+                # Rule functions may still choose an implementation
+                if impl is None:
+                    impl = r.impl
+                kept.append(r)
+            elif impl is None:
+                impl = rule_impl
+                kept.append(r)
+            elif rule_impl is impl:
+                kept.append(r)
+        if impl is None:
+            impl = self.interface
+        if len(kept) != len(rules):
+            kept.reverse()
+            rules = kept
 
-        return rules
+        if isinstance(impl, ChoiceFuncImplementation):
+            return impl, rules
+        if isinstance(impl, ChoiceFunction):
+            return impl.interface, rules
+        raise NonRule()
 
     def __call__(self, *args: Any, **kwargs: Any) -> O:
-        stack_info = inspect.stack()
-        rules = self._sorted_selectors(stack_info)
-
-        impl = self.interface
-        for rule in reversed(rules):
-            if rule.impl is not None:
-                impl = rule.impl  # Override with best matched rule if one is applicable
-                break
-
-        # Prune non-matching implementations for arg overrides
-        rules = [r for r in rules if r.rule.impl == impl or r.rule.impl is None]
+        if not self.rules and trace_status.trace is None:
+            # Nothing can override the interface and there is no trace to record
+            return self.interface.func(*args, **kwargs)
 
-        if isinstance(impl, ChoiceFuncImplementation):
-            pass
-        elif isinstance(impl, ChoiceFunction):
-            impl = impl.interface
-        else:
-            raise NonRule()
+        stack_info = current_stack()
+        rules = self._sorted_selectors(stack_info)
 
+        impl, rules = self._select_impl(rules) if rules else (self.interface, rules)
         choice_kwargs = impl.choice_kwargs(rules, args, kwargs)
-        trace_status.call_begin(TraceItem(self, impl, rules, stack_info, args, kwargs, choice_kwargs))
+        trace = trace_status.trace
+        if trace is None:
+            return impl.func(*args, **choice_kwargs)
+        trace.begin(TraceItem(self, impl, rules, stack_info, args, kwargs, choice_kwargs))
         res = impl.func(*args, **choice_kwargs)
-        trace_status.call_end()
+        if trace_status.trace is trace:
+            # Tracing may have been stopped during the call, leaving its Trace final
+            trace.end()
         return res
 
 
@@ -552,7 +669,7 @@ def rule(selector: SEL, impl: ChoiceFunction | ChoiceFuncImplementation | None,
         choice_fun = cast(ChoiceFunction, choice_fun)
     else:
         raise TypeError()
-    choice_fun._add_rule(Rule(sel, processed_impl, lambda _: (processed_impl, kwargs)))
+    choice_fun._add_rule(Rule(sel, processed_impl, StaticVals(processed_impl, kwargs), uses_captures=False))
 
 
 def def_rule(selector: SEL) -> Any:
@@ -703,6 +820,12 @@ class ChoiceJSONEncoder(json.JSONEncoder):
         ```
     """
 
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # Encoded functions, implementations and rules by id, as they recur
+        # across the trace items and the registry
+        self._shared: dict[int, dict[str, Any]] = {}
+
     def default(self, obj: Any) -> Any:
         """Convert PyChoice objects to JSON-serializable dictionaries.
 
@@ -712,10 +835,19 @@ class ChoiceJSONEncoder(json.JSONEncoder):
         Returns:
             JSON-serializable representation of the object
         """
+        if isinstance(obj, (ChoiceFunction, ChoiceFuncImplementation, Rule)):
+            encoded = self._shared.get(id(obj))
+            if encoded is None:
+                encoded = self._shared[id(obj)] = self._encode(obj)
+            return encoded
+        return self._encode(obj)
+
+    def _encode(self, obj: Any) -> Any:
+        """Build the JSON-serializable representation of an object."""
         if isinstance(obj, TraceItem):
             return obj.to_dict()
         elif isinstance(obj, Trace):
-            return {"items": [item.to_dict() for item in obj.items], "registry": {str(f.id): f for f in registry}}
+            return {"items": obj.items, "registry": {str(f.id): f for f in registry}}
         elif isinstance(obj, ChoiceFunction):
             return {
                 "id": str(obj.id),
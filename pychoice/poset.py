@@ -9,7 +9,8 @@ The poset visualization is particularly useful for debugging complex choice
 rule hierarchies and understanding how different selectors relate to each other.
 """
 
-from typing import Optional
+from collections.abc import Hashable
+from typing import Any, Optional
 
 import matplotlib.pyplot as plt
 import networkx as nx
@@ -17,6 +18,45 @@ import networkx as nx
 from .args import Selector
 
 
+def _candidate_groups(selectors: list[Selector]) -> list[list[int]]:
+    """Group the indices of selectors that generic_compare may relate.
+
+    Related selectors share their innermost item, so only selectors within a
+    group need to be compared. The empty selector relates to every other
+    selector, so it joins every group.
+
+    Args:
+        selectors: List of Selector objects to group
+
+    Returns:
+        List of groups of selector indices
+    """
+    empty: list[int] = []
+    groups: dict[Any, list[int]] = {}
+    # Groups of items that can't be hashed, searched by equality
+    unhashable: list[tuple[Any, list[int]]] = []
+    for i, sel in enumerate(selectors):
+        if not sel.items:
+            empty.append(i)
+            continue
+        last = sel.items[-1]
+        hashable = isinstance(last, Hashable)
+        group = groups.get(last) if hashable else None
+        if group is None:
+            # An equal item may still lead a group of the other kind
+            candidates = unhashable if hashable else [*groups.items(), *unhashable]
+            group = next((indices for key, indices in candidates if key == last), None)
+        if group is None:
+            group = []
+            if hashable:
+                groups[last] = group
+            else:
+                unhashable.append((last, group))
+        group.append(i)
+    all_groups = [*groups.values(), *(indices for _, indices in unhashable)]
+    return [empty + group for group in all_groups] or [empty]
+
+
 def build_selector_poset(selectors: list[Selector]) -> nx.DiGraph:
     """Build a directed graph representing the partial order of selectors.
 
@@ -48,18 +88,24 @@ def build_selector_poset(selectors: list[Selector]) -> nx.DiGraph:
     G: nx.DiGraph = nx.DiGraph()
 
     # Add nodes (each selector becomes a node)
-    for sel in selectors:
-        G.add_node(str(sel))
-
-    # Add edges based on sub-selector relationships
-    for i, a in enumerate(selectors):
-        for j, b in enumerate(selectors):
-            if i == j:
-                continue
-            cmp = a.generic_compare(b)
-            if cmp == 1:
-                # a is a sub-selector of b (more specific than b)
-                G.add_edge(str(a), str(b))
+    labels = [str(sel) for sel in selectors]
+    G.add_nodes_from(labels)
+
+    # Add edges based on sub-selector relationships. generic_compare is
+    # antisymmetric, so each unordered pair is compared once
+    lengths = [len(sel.items) for sel in selectors]
+    for group in _candidate_groups(selectors):
+        for pos, i in enumerate(group):
+            for j in group[pos + 1 :]:
+                if lengths[i] == lengths[j]:
+                    # Selectors of the same length are equal or unrelated
+                    continue
+                cmp = selectors[i].generic_compare(selectors[j])
+                if cmp == 1:
+                    # selectors[i] is a sub-selector of selectors[j] (more specific than it)
+                    G.add_edge(labels[i], labels[j])
+                elif cmp == -1:
+                    G.add_edge(labels[j], labels[i])
 
     # Remove transitive edges for clearer visualization
     # This keeps only direct parent-child relationships
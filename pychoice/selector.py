@@ -9,9 +9,12 @@ and the infrastructure for managing choice contexts.
 from __future__ import annotations
 
 import inspect
+import sys
+from collections.abc import Hashable, Iterable, Iterator, Sequence
 from contextvars import ContextVar
-from types import TracebackType
-from typing import Any, Callable, Optional, Union
+from types import CodeType, FrameType, TracebackType
+from typing import Any, Callable, Optional, Self, Union, cast, overload
+from weakref import WeakValueDictionary, ref
 
 
 class ChoiceContext:
@@ -47,6 +50,119 @@ class ChoiceContext:
         return None
 
 
+class FrameView:
+    """Lightweight view of a stack frame used for selector matching.
+
+    FrameView is a cheap replacement for inspect.FrameInfo. It exposes the same
+    frame, function, filename, and lineno attributes, but computes them lazily
+    from the frame instead of reading source files for every frame on the stack.
+
+    Attributes:
+        frame: The underlying Python frame object
+    """
+
+    __slots__ = ("frame",)
+
+    def __init__(self, frame: FrameType):
+        self.frame = frame
+
+    @property
+    def function(self) -> str:
+        """Name of the function executing in this frame."""
+        return self.frame.f_code.co_name
+
+    @property
+    def filename(self) -> str:
+        """Filename of the code executing in this frame."""
+        return self.frame.f_code.co_filename
+
+    @property
+    def lineno(self) -> int:
+        """Line number currently executing in this frame."""
+        return self.frame.f_lineno
+
+
+def _iter_frames(frame: FrameType | None) -> Iterator[FrameView]:
+    """Walk the call stack outwards starting from a frame.
+
+    Args:
+        frame: The innermost frame to start from
+
+    Yields:
+        A FrameView for each frame from the innermost to the outermost
+    """
+    while frame is not None:
+        yield FrameView(frame)
+        frame = frame.f_back
+
+
+class FrameStack(Sequence[FrameView]):
+    """A captured call stack that wraps frames into FrameViews on access.
+
+    Keeping the raw frames lets stack_fingerprint() read code objects directly,
+    so calls whose matches are memoized never allocate a FrameView.
+
+    Attributes:
+        frames: The frame objects, from the innermost to the outermost
+    """
+
+    __slots__ = ("_views", "frames")
+
+    def __init__(self, frames: list[FrameType]):
+        self.frames = frames
+        self._views: list[FrameView | None] = [None] * len(frames)
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    @overload
+    def __getitem__(self, index: int) -> FrameView: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[FrameView]: ...
+
+    def __getitem__(self, index: int | slice) -> FrameView | list[FrameView]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.frames)))]
+        view = self._views[index]
+        if view is None:
+            view = self._views[index] = FrameView(self.frames[index])
+        return view
+
+    def __iter__(self) -> Iterator[FrameView]:
+        for i in range(len(self.frames)):
+            yield self[i]
+
+
+def current_stack() -> FrameStack:
+    """Capture the call stack of the caller.
+
+    This is a replacement for inspect.stack() that only walks frame objects
+    and avoids the source file and linecache lookups done by inspect.
+
+    Returns:
+        FrameStack of the frames, starting with the frame that called current_stack()
+    """
+    frames = []
+    frame: FrameType | None = sys._getframe(1)
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    return FrameStack(frames)
+
+
+def iter_stack() -> Iterator[FrameView]:
+    """Lazily walk the call stack of the caller.
+
+    Unlike current_stack(), frames are only visited as the iterator is consumed,
+    so callers that stop early never touch the outer frames.
+
+    Returns:
+        Iterator of FrameViews, starting with the frame that called iter_stack()
+    """
+    return _iter_frames(sys._getframe(1))
+
+
 class SelectorItem:
     """Abstract base class for items that can be used in choice selectors.
 
@@ -56,8 +172,25 @@ class SelectorItem:
 
     This is an abstract base class - use concrete subclasses like
     FunctionSelectorItem, ClassSelectorItem, or ChoiceContextSelectorItem.
+
+    Attributes:
+        cacheable: True if matching depends only on the frame's code object
+            (and its ``self`` for callable objects), so match results can be
+            memoized by stack fingerprint
+        capture_keys: Names of the variables to capture from the matched
+            frame, or None to capture all of them
+        captures_call_arguments: True if the item matches the ``__call__`` of a
+            choice function, so captures are the bound call arguments rather
+            than the frame locals
+        code: Code object a frame must be executing to match this item, or
+            None if the item is not tied to one
     """
 
+    cacheable: bool = False
+    capture_keys: frozenset[str] | None = None
+    captures_call_arguments: bool = False
+    code: CodeType | None = None
+
     def __init__(self) -> None:
         pass
 
@@ -78,7 +211,7 @@ class SelectorItem:
         """
         raise NotImplementedError
 
-    def matches(self, frame_info: inspect.FrameInfo) -> bool:
+    def matches(self, frame_info: FrameView) -> bool:
         """Check if this selector item matches a stack frame.
 
         Args:
@@ -96,8 +229,90 @@ class SelectorItem:
 SEL_I_CLS = tuple[type, str]
 SEL_I = Union[Callable[..., Any], SEL_I_CLS, ChoiceContext, SelectorItem]
 SEL = list[Callable[..., Any]]
-StackFrame = list[inspect.FrameInfo]
+StackFrame = Sequence[FrameView]
 OptStackFrame = Optional[StackFrame]
+FrameIter = Iterable[FrameView]
+StackFingerprint = tuple[tuple[int, ...], tuple[Any, ...]]
+
+_self_bound_codes: dict[int, CodeType] = {}
+"""Code objects of ``__call__`` methods matched by CallableSelectorItems, keyed by id."""
+
+
+def stack_fingerprint(stack_info: StackFrame) -> StackFingerprint | None:
+    """Compute a cheap identity fingerprint of a call stack.
+
+    Two stacks with the same fingerprint match every cacheable SelectorItem
+    identically. The fingerprint is made of the ids of each frame's code object,
+    plus the position and the id of ``self`` of frames executing a ``__call__``
+    method that a CallableSelectorItem can match on.
+
+    Args:
+        stack_info: Stack frames to fingerprint
+
+    Returns:
+        Tuple of (ids, refs) where ids is the hashable fingerprint and refs holds
+        the code objects followed by weak references to the ``self`` objects.
+        Keep refs alive as long as the ids are in use so the code ids can not be
+        reused, and check that the weak references are alive before trusting
+        the ``self`` ids. None if a ``self`` object can't be weakly referenced,
+        in which case the stack should not be memoized.
+    """
+    frames = stack_info.frames if isinstance(stack_info, FrameStack) else [fi.frame for fi in stack_info]
+    codes = [frame.f_code for frame in frames]
+    # The frame count comes first so the trailing (position, owner) pairs are unambiguous
+    ids = [len(codes), *map(id, codes)]
+    refs: list[Any] = codes
+    bound = [i for i, code in enumerate(codes) if id(code) in _self_bound_codes]
+    if bound:
+        owners = [frames[i].f_locals.get("self", None) for i in bound]
+        try:
+            # Weak references so the cache doesn't keep user objects alive
+            owner_refs = [None if owner is None else ref(owner) for owner in owners]
+        except TypeError:
+            return None
+        ids += bound
+        ids += map(id, owners)
+        refs = codes + owner_refs
+    return tuple(ids), tuple(refs)
+
+
+_interned_items: WeakValueDictionary[tuple[type, Hashable], InternedSelectorItem] = WeakValueDictionary()
+"""Canonical instance of each interned selector item, keyed by (class, intern key)."""
+
+
+class InternedSelectorItem(SelectorItem):
+    """Base class for selector items with one canonical instance per identity.
+
+    Constructing an item that equals an existing live item returns the existing
+    instance, so equality between interned items is a plain identity check and
+    they can be used as dict keys. Subclasses define _intern_key to describe
+    their identity.
+    """
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> Self:
+        key = (cls, cls._intern_key(*args, **kwargs))
+        item = _interned_items.get(key)
+        if item is None:
+            item = super().__new__(cls)
+            _interned_items[key] = item
+        return cast(Self, item)
+
+    @classmethod
+    def _intern_key(cls, *args: Any, **kwargs: Any) -> Hashable:
+        """Compute the identity of an item from its constructor arguments.
+
+        Objects are identified by id() since the interned item keeps them alive.
+
+        Raises:
+            NotImplementedError: Must be implemented by subclasses
+        """
+        raise NotImplementedError
+
+    def __eq__(self, other: object) -> bool:
+        # Equal items are interned to the same object
+        return self is other
+
+    __hash__ = object.__hash__
 
 
 class InvalidSelectorItem(TypeError):
@@ -135,7 +350,7 @@ class NonFunction(TypeError):
         super().__init__("Expected a choice function for the final term in a selector")
 
 
-class ChoiceContextSelectorItem(SelectorItem):
+class ChoiceContextSelectorItem(InternedSelectorItem):
     """Selector item that matches when a specific ChoiceContext is active.
 
     This selector matches stack frames that occur while a particular
@@ -165,10 +380,11 @@ class ChoiceContextSelectorItem(SelectorItem):
     def __str__(self) -> str:
         return f"ChoiceContext(active={self.context.active.get()})"
 
-    def __eq__(self, other: object) -> bool:
-        return isinstance(other, ChoiceContextSelectorItem) and self.context == other.context
+    @classmethod
+    def _intern_key(cls, context: type[ChoiceContext]) -> Hashable:
+        return id(context)
 
-    def matches(self, frame_info: inspect.FrameInfo) -> bool:
+    def matches(self, frame_info: FrameView) -> bool:
         """Check if the context is currently active.
 
         Args:
@@ -180,7 +396,7 @@ class ChoiceContextSelectorItem(SelectorItem):
         return self.context.active.get()
 
 
-class FunctionSelectorItem(SelectorItem):
+class FunctionSelectorItem(InternedSelectorItem):
     """Selector item that matches specific function calls.
 
     This selector matches stack frames where the executing code corresponds
@@ -199,6 +415,8 @@ class FunctionSelectorItem(SelectorItem):
         ```
     """
 
+    cacheable = True
+
     def __init__(self, func: Callable[..., Any]):
         """Initialize with a function to match.
 
@@ -206,18 +424,20 @@ class FunctionSelectorItem(SelectorItem):
             func: The function that this selector should match
         """
         self.func = func
+        self.code = getattr(func, "__code__", None)
 
     def __str__(self) -> str:
         return self.func.__name__
 
-    def __eq__(self, other: object) -> bool:
-        return isinstance(other, FunctionSelectorItem) and self.func == other.func
+    @classmethod
+    def _intern_key(cls, func: Callable[..., Any]) -> Hashable:
+        return id(func)
 
     def get_callable(self) -> Callable[..., Any] | None:
         """Return the function this selector represents."""
         return self.func
 
-    def matches(self, frame_info: inspect.FrameInfo) -> bool:
+    def matches(self, frame_info: FrameView) -> bool:
         """Check if the stack frame is executing this function.
 
         Args:
@@ -226,10 +446,10 @@ class FunctionSelectorItem(SelectorItem):
         Returns:
             True if the frame is executing this function, False otherwise
         """
-        return self.func.__code__ == frame_info.frame.f_code
+        return self.code is frame_info.frame.f_code
 
 
-class CallableSelectorItem(SelectorItem):
+class CallableSelectorItem(InternedSelectorItem):
     """Selector item that matches callable objects (including choice functions).
 
     This selector handles callable objects that may not be simple functions,
@@ -249,25 +469,36 @@ class CallableSelectorItem(SelectorItem):
         ```
     """
 
+    cacheable = True
+
     def __init__(self, func: Callable[..., Any]):
         """Initialize with a callable to match.
 
         Args:
             func: The callable object that this selector should match
         """
+        # Import ChoiceFunction here to avoid circular imports
+        from .funcs import ChoiceFunction
+
         self.func: Callable[..., Any] = func
+        self.captures_call_arguments = isinstance(func, ChoiceFunction)
+        self.code = getattr(func.__call__, "__code__", None)  # type: ignore[operator]
+        if self.code is not None:
+            # Matching depends on the frame's self, so fingerprints must include it
+            _self_bound_codes[id(self.code)] = self.code
 
     def __str__(self) -> str:
         return self.func.__name__
 
-    def __eq__(self, other: object) -> bool:
-        return isinstance(other, CallableSelectorItem) and self.func == other.func
+    @classmethod
+    def _intern_key(cls, func: Callable[..., Any]) -> Hashable:
+        return id(func)
 
     def get_callable(self) -> Callable[..., Any] | None:
         """Return the callable this selector represents."""
         return self.func
 
-    def matches(self, frame_info: inspect.FrameInfo) -> bool:
+    def matches(self, frame_info: FrameView) -> bool:
         """Check if the stack frame is executing this callable.
 
         This method handles the complexity of matching callable objects,
@@ -279,14 +510,13 @@ class CallableSelectorItem(SelectorItem):
         Returns:
             True if the frame is executing this callable, False otherwise
         """
-        if not hasattr(self.func.__call__, "__code__"):  # type: ignore[operator]
+        frame = frame_info.frame
+        if self.code is not frame.f_code:
             return False
-        if self.func.__call__.__code__ != frame_info.frame.f_code:  # type: ignore[operator]
-            return False
-        return not (hasattr(self.func, "__class__") and self.func != frame_info.frame.f_locals.get("self", None))
+        return not (hasattr(self.func, "__class__") and self.func != frame.f_locals.get("self", None))
 
 
-class ClassSelectorItem(SelectorItem):
+class ClassSelectorItem(InternedSelectorItem):
     """Selector item that matches specific class methods.
 
     This selector matches stack frames where a specific method of a specific
@@ -309,6 +539,8 @@ class ClassSelectorItem(SelectorItem):
         ```
     """
 
+    cacheable = True
+
     def __init__(self, cls: type, func_name: str):
         """Initialize with a class and method name to match.
 
@@ -319,14 +551,19 @@ class ClassSelectorItem(SelectorItem):
         self.cls = cls
         self.qual_name = f"{cls.__name__}.{func_name}"
         self.func_name = func_name
+        # Whether each code object seen with the method name belongs to the class,
+        # keyed by id since equal code objects may belong to unrelated classes.
+        # The code object is kept so its id can not be reused
+        self._code_matches: dict[int, tuple[CodeType, bool]] = {}
 
     def __str__(self) -> str:
         return self.qual_name
 
-    def __eq__(self, other: object) -> bool:
-        return isinstance(other, ClassSelectorItem) and self.cls == other.cls and self.func_name == other.func_name
+    @classmethod
+    def _intern_key(cls, item_cls: type, func_name: str) -> Hashable:
+        return (id(item_cls), func_name)
 
-    def matches(self, frame_info: inspect.FrameInfo) -> bool:
+    def matches(self, frame_info: FrameView) -> bool:
         """Check if the stack frame is executing this class method.
 
         This method checks both the method name and class hierarchy,
@@ -339,14 +576,23 @@ class ClassSelectorItem(SelectorItem):
         Returns:
             True if frame is executing this class method or a subclass override
         """
-        if frame_info.frame.f_code.co_name == self.func_name:
-            qualname = frame_info.frame.f_code.co_qualname
-            parts = qualname.split(".")
-            if len(parts) > 1:
-                class_name = parts[0]
-                module = inspect.getmodule(frame_info.frame)
-                cls = getattr(module, class_name, None)
-                if not isinstance(cls, type):
-                    return False
-                return cls == self.cls or issubclass(cls, self.cls)
+        code = frame_info.frame.f_code
+        if code.co_name != self.func_name:
+            return False
+        cached = self._code_matches.get(id(code))
+        if cached is None:
+            # Resolving the module and class is slow, but depends only on the code
+            cached = self._code_matches[id(code)] = (code, self._class_matches(frame_info.frame))
+        return cached[1]
+
+    def _class_matches(self, frame: FrameType) -> bool:
+        """Check if the class whose method the frame executes is this class or a subclass."""
+        parts = frame.f_code.co_qualname.split(".")
+        if len(parts) > 1:
+            class_name = parts[0]
+            module = inspect.getmodule(frame)
+            cls = getattr(module, class_name, None)
+            if not isinstance(cls, type):
+                return False
+            return cls == self.cls or issubclass(cls, self.cls)
         return False
@@ -1,6 +1,15 @@
+import functools
+import inspect
+import json
+import threading
+
 import pytest
 
 import pychoice as choice
+import pychoice.args
+import pychoice.funcs
+from pychoice.args import MatchedRule, Rule, Selector, StaticVals, _parameter_info
+from pychoice.funcs import ChoiceJSONEncoder, new_selector
 
 
 @choice.func(args=["greeting"])
@@ -8,10 +17,25 @@ def greet(name: str, greeting="Hello"):
     return f"{greeting} {name}"
 
 
+@choice.func()
+def no_rules(value: int):
+    return value
+
+
 def wrap_greet(name: str):
     return greet(name)
 
 
+@choice.func()
+def greet_all(names: list[str]):
+    return [greet(name) for name in names]
+
+
+@choice.func()
+def stop_tracing():
+    return choice.trace_stop()
+
+
 def test_registry_entry():
     assert "greet" in [f.interface.func.__name__ for f in choice.registry]
 
@@ -21,10 +45,51 @@ def test_greet():
     assert greet("me") == "Hello me"
     trace = choice.trace_stop()
     print(trace)
+    assert str(trace).splitlines()[0] == "greet [greet]"
     assert len(trace.items) == 1
     assert len(trace.items[0].items) == 0
 
 
+def test_nested_trace():
+    choice.trace_start()
+    greet_all(["a", "b"])
+    trace = choice.trace_stop()
+    assert len(trace.items) == 1
+    assert [item.args for item in trace.items[0].items] == [("a",), ("b",)]
+    assert trace.items[0].items[0].parent is trace.items[0]
+    data = json.loads(json.dumps(trace, cls=ChoiceJSONEncoder))
+    assert [item["args"] for item in data["items"][0]["items"]] == [["a"], ["b"]]
+
+
+def test_stop_mid_call():
+    choice.trace_start()
+    trace = stop_tracing()
+    # The call still running when tracing stopped must not be added afterwards
+    assert trace.items == []
+    assert choice.trace_status.trace is None
+
+
+def test_trace_json():
+    choice.trace_start()
+    greet("me")
+    greet("you")
+    trace = choice.trace_stop()
+    data = json.loads(json.dumps(trace, cls=ChoiceJSONEncoder))
+    assert [item["args"] for item in data["items"]] == [["me"], ["you"]]
+    assert data["registry"][str(greet.id)]["interface"]["func"] == "greet"
+
+
+def test_no_rules_trace():
+    assert no_rules(1) == 1
+    choice.trace_start()
+    assert no_rules(2) == 2
+    trace = choice.trace_stop()
+    assert len(trace.items) == 1
+    assert trace.items[0].rules == []
+    # Only frame locations are kept in the trace
+    assert ("test_no_rules_trace", __file__) in [(f, file) for f, file, _ in trace.items[0].stack_info]
+
+
 def test_override():
     assert greet("me") == "Greetings me"
 
@@ -48,6 +113,43 @@ choice.rule([wrap_greet, greet], greet, greeting="Wrap")
 choice.rule([test_override_override, wrap_greet, greet], greet, greeting="Greetings")
 
 
+def test_override_trace_captures():
+    assert greet("me") == "Traced me"
+    choice.trace_start()
+    assert greet("you") == "Traced you"
+    trace = choice.trace_stop()
+    captures = trace.items[0].rules[-1].captures
+    assert captures[1] == {"name": "you", "greeting": "Hello"}
+
+
+choice.rule([test_override_trace_captures, greet], greet, greeting="Traced")
+
+
+def test_duplicate_rule():
+    assert greet("me") == "Twice me"
+    assert len([r for r in greet.rules if r.selector.items[0].get_callable() is test_duplicate_rule]) == 2
+
+
+choice.rule([test_duplicate_rule, greet], greet, greeting="Twice")
+choice.rule([test_duplicate_rule, greet], greet, greeting="Other")
+choice.rule([test_duplicate_rule, greet], greet, greeting="Twice")
+
+
+def test_duplicate_rule_doc():
+    def rule(doc):
+        return Rule(new_selector([test_duplicate_rule_doc, greet]), None, StaticVals(None, {"greeting": "Doc"}), doc)
+
+    greet._add_rule(rule("Why the rule exists"))
+    greet._add_rule(rule(None))
+    docs = [r.doc for r in greet.rules if r.selector.items[0].get_callable() is test_duplicate_rule_doc]
+    # An undocumented duplicate keeps the earlier doc
+    assert docs == ["Why the rule exists"]
+    greet._add_rule(rule("Updated reason"))
+    docs = [r.doc for r in greet.rules if r.selector.items[0].get_callable() is test_duplicate_rule_doc]
+    assert docs == ["Updated reason"]
+    assert greet("me") == "Doc me"
+
+
 def test_only_args():
     assert greet("me") == "Greetings me"
 
@@ -99,3 +201,118 @@ def test_match():
 
 
 choice.rule([choice.Match(greet, name="dog2")], greet, greeting="What's up")
+
+
+def test_match_with_captures():
+    assert wrap_greet("cap") == "Captured cap"
+
+
+@choice.def_rule([
+    test_match_with_captures,
+    choice.Match(wrap_greet).with_captures("name"),
+    choice.Match(greet).with_captures("greeting"),
+])
+def rule_test_match_with_captures(captures):
+    if captures[1] == {"name": "cap"} and captures[2] == {"greeting": "Hello"}:
+        return greet, {"greeting": "Captured"}
+    return None
+
+
+def test_matched_rule_lazy_vals():
+    calls = []
+
+    def vals(captures):
+        calls.append(captures)
+        return None, {"greeting": "Lazy"}
+
+    matched = MatchedRule(Rule(Selector([]), None, vals), [])
+    assert calls == []
+    assert matched.vals == {"greeting": "Lazy"}
+    assert matched.impl is None
+    assert len(calls) == 1
+
+
+def test_parameter_info():
+    def params(a, /, b, c=1, *args, d, e=2, **kwargs):
+        pass
+
+    def simple(a, b=2):
+        pass
+
+    for f in [params, simple]:
+        wrapped = functools.wraps(f)(lambda *args, **kwargs: None)
+        assert _parameter_info(f) == _parameter_info(wrapped)
+    assert _parameter_info(params) == (("a", "b", "c"), False, None, {"b": inspect.Parameter.empty, "c": 1})
+    assert _parameter_info(simple) == (("a", "b"), True, 2, {"a": inspect.Parameter.empty, "b": 2})
+
+
+def test_choice_kwargs_copy():
+    choice.trace_start()
+    assert wrap_greet("me") == "Wrap me"
+    trace = choice.trace_stop()
+    # Mutating a traced result must not leak into the rule values
+    trace.items[0].choice_kwargs["greeting"] = "Mutated"
+    assert wrap_greet("me") == "Wrap me"
+
+
+@choice.func(args=["greeting"])
+def static_greet(name: str, greeting="Hello"):
+    return f"{greeting} {name}"
+
+
+choice.rule([static_greet], static_greet, greeting="Static")
+
+
+def test_choice_kwargs_read_only():
+    choice.trace_start()
+    assert static_greet("me") == "Static me"
+    trace = choice.trace_stop()
+    # Without caller kwargs the rule values are passed as a read-only view
+    with pytest.raises(TypeError):
+        trace.items[0].choice_kwargs["greeting"] = "Mutated"
+    assert static_greet("me") == "Static me"
+    assert static_greet("me", greeting="Hi") == "Hi me"
+
+
+def test_threaded_calls(monkeypatch):
+    # A tiny match cache makes the threads evict each other's entries
+    monkeypatch.setattr(pychoice.args, "MATCH_CACHE_SIZE", 2)
+    errors = []
+
+    def run():
+        try:
+            for _ in range(200):
+                assert wrap_greet("me") == "Wrap me"
+                assert greet("me") == "Hello me"
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+
+
+@choice.func()
+def racy_greet(name: str):
+    return f"Hello {name}"
+
+
+def test_rule_added_during_trie_build(monkeypatch):
+    choice.rule([racy_greet], racy_greet)
+    build_trie = pychoice.funcs.RuleTrie
+    added = threading.Thread(target=choice.rule, args=([test_rule_added_during_trie_build, racy_greet], racy_greet))
+
+    def slow_trie(rules):
+        # Add a rule from another thread while the trie is being built
+        added.start()
+        added.join(0.1)
+        return build_trie(rules)
+
+    monkeypatch.setattr(pychoice.funcs, "RuleTrie", slow_trie)
+    assert racy_greet("me") == "Hello me"
+    added.join()
+    # The trie built from the old rules must not replace the invalidation
+    assert racy_greet._trie is None
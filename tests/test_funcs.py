@@ -108,6 +108,32 @@ class TestChildClass(ParentClass):
 
 choice.rule([(ParentClass, "test_child_class_override"), foo], bar)
 
+# Test that identical methods of unrelated classes are told apart
+
+
+class RunBase:
+    pass
+
+
+class RunChild(RunBase):
+    def run(self):
+        return foo()
+
+
+class RunUnrelated:
+    def run(self):
+        return foo()
+
+
+choice.rule([(RunBase, "run"), foo], bar)
+
+
+def test_class_identical_methods():
+    assert RunChild().run() == "bar"
+    assert RunUnrelated().run() == "foo"
+    assert RunChild().run() == "bar"
+
+
 # Test with Context
 
 
@@ -121,3 +147,27 @@ def test_context():
 
 
 choice.rule([MyChoiceContext, foo], bar)
+
+
+def test_context_repeated():
+    for _ in range(2):
+        assert foo() == "foo"
+        with MyChoiceContext():
+            assert foo() == "bar"
+
+
+# Test repeated calls through different call paths
+
+
+def loop_foo():
+    return foo()
+
+
+def test_repeated_call_paths():
+    for _ in range(3):
+        assert loop_foo() == "bar"
+        assert foo() == "foo"
+        assert choice_wrap_foo() == "bar"
+
+
+choice.rule([loop_foo, foo], bar)
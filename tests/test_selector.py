@@ -1,8 +1,14 @@
+import gc
+import weakref
+from functools import cmp_to_key
+
 import networkx as nx
 import pytest
 
-from pychoice.args import Selector
+from pychoice.args import Rule, RuleTrie, Selector, StaticVals
+from pychoice.funcs import Match, new_selector, new_selector_item
 from pychoice.poset import build_selector_poset, visualize_selector_poset
+from pychoice.selector import SelectorItem, current_stack, stack_fingerprint
 
 # Define functions
 
@@ -36,6 +42,118 @@ class TestSelectorGenericCompare:
         assert Selector([foo]).generic_compare(Selector([bar])) == 0
 
 
+class TestSelectorItemInterning:
+    def test_function_item(self):
+        assert new_selector_item(foo) is new_selector_item(foo)
+        assert new_selector_item(foo) != new_selector_item(bar)
+        assert len({new_selector_item(foo), new_selector_item(foo), new_selector_item(bar)}) == 2
+
+    def test_class_item(self):
+        assert new_selector_item((TestSelectorItemInterning, "a")) is new_selector_item((
+            TestSelectorItemInterning,
+            "a",
+        ))
+        assert new_selector_item((TestSelectorItemInterning, "a")) != new_selector_item((
+            TestSelectorItemInterning,
+            "b",
+        ))
+
+    def test_match(self):
+        assert Match(foo, x=[1]) == Match(foo, x=[1])
+        assert Match(foo, x=[1]) != Match(foo, x=[2])
+        assert hash(Match(foo, x=[1])) == hash(Match(foo, x=[1]))
+
+
+def call_check(check):
+    return check()
+
+
+class TestSelectorAllMatches:
+    def test_all_matches(self):
+        def check():
+            return Selector.all_matches([
+                new_selector([call_check, check]),
+                new_selector([foo, check]),
+                new_selector([call_check]),
+                new_selector([foo]),
+                new_selector([]),
+            ])
+
+        assert call_check(check) == [True, False, True, False, True]
+
+
+def call_call_check(check):
+    return call_check(check)
+
+
+class TestSelectorSort:
+    def test_sort(self):
+        selectors = [
+            new_selector([call_check, call_check]),
+            new_selector([check_sort]),
+            new_selector([call_call_check, check_sort]),
+            new_selector([foo, check_sort]),
+            new_selector([]),
+            new_selector([call_check, check_sort]),
+            new_selector([call_call_check, call_check, check_sort]),
+        ]
+        order, expected = call_call_check(lambda: check_sort(selectors))
+        assert order == expected
+        assert order == [4, 1, 2, 5, 6]
+
+
+class TestRuleTrie:
+    def test_match(self):
+        selectors = [
+            new_selector([call_check, call_check]),
+            new_selector([check_trie]),
+            new_selector([call_call_check, check_trie]),
+            new_selector([foo, check_trie]),
+            new_selector([]),
+            new_selector([call_check, check_trie]),
+            new_selector([call_call_check, call_check, check_trie]),
+            new_selector([call_check, check_trie]),
+        ]
+        matches, expected = call_call_check(lambda: check_trie(selectors))
+        assert matches == expected
+        assert [index for index, _ in matches] == [4, 1, 2, 5, 7, 6]
+
+    def test_match_rules_static(self):
+        selector = new_selector([call_check, check_static])
+        trie = RuleTrie([Rule(selector, None, StaticVals(None, {"x": 1}), uses_captures=False)])
+        first, second, traced = call_check(lambda: check_static(trie))
+        assert first is second
+        assert [m.vals for m in first] == [{"x": 1}]
+        assert first[0].captures == []
+        assert len(traced[0].captures) == 2
+
+
+def check_static(trie):
+    return [
+        trie.match_rules(stack_info, stack_fingerprint(stack_info), collect_static=collect)
+        for collect, stack_info in [(False, current_stack()), (False, current_stack()), (True, current_stack())]
+    ]
+
+
+def check_trie(selectors):
+    stack_info = current_stack()
+    trie = RuleTrie([Rule(selector, None, lambda c: None) for selector in selectors])
+    assert len(trie.root.children) == 2
+    positions = [selector.match_positions(stack_info) for selector in selectors]
+    order = sorted(
+        (i for i, p in enumerate(positions) if p is not None),
+        key=cmp_to_key(lambda a, b: selectors[a].compare(selectors[b], stack_info) or a - b),
+    )
+    return trie.match(stack_info), [(i, positions[i]) for i in order]
+
+
+def check_sort(selectors):
+    stack_info = current_stack()
+    indices = [i for i, matches in enumerate(Selector.all_matches(selectors, stack_info)) if matches]
+    expected = sorted(indices, key=cmp_to_key(lambda a, b: selectors[a].compare(selectors[b], stack_info)))
+    return Selector.sort(selectors), expected
+
+
 test_selectors_raw = [
     [foo],
     [bar, foo],
@@ -45,6 +163,23 @@ test_selectors_raw = [
 test_selectors = [Selector(sel) for sel in test_selectors_raw]
 
 
+class TestStackFingerprint:
+    def test_weak_owner(self):
+        class Greeter:
+            def __call__(self):
+                return current_stack()
+
+        greeter = Greeter()
+        new_selector_item(greeter)
+        fingerprint = stack_fingerprint(greeter())
+        assert fingerprint is not None
+        # The fingerprint must not keep the matched object alive
+        owner = weakref.ref(greeter)
+        del greeter
+        gc.collect()
+        assert owner() is None
+
+
 class TestSelectorPoset:
     def test_build_selector_poset(self):
         poset = build_selector_poset(test_selectors)
@@ -54,6 +189,23 @@ class TestSelectorPoset:
         text_string = "\n".join(text_lines)
         print(text_string)
 
+    def test_unhashable_items(self):
+        class NamedItem(SelectorItem):
+            __hash__ = None  # type: ignore[assignment]
+
+            def __init__(self, name):
+                self.name = name
+
+            def __eq__(self, other):
+                return isinstance(other, NamedItem) and self.name == other.name
+
+            def __str__(self):
+                return self.name
+
+        # Distinct but equal innermost items must still be compared
+        selectors = [Selector([NamedItem("x")]), Selector([new_selector_item(foo), NamedItem("x")])]
+        assert len(build_selector_poset(selectors).edges) == 1
+
     @pytest.mark.skip
     def test_visualize_selector_poset(self):
         visualize_selector_poset(test_selectors, filename="test_poset.png")